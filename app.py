@@ -8,12 +8,16 @@ import os
 import sys
 import json
 import uuid
+import logging
 import threading
 import time
 from datetime import datetime, timedelta
 
 import numpy as np
-from flask import Flask, render_template, request, jsonify, session, send_from_directory
+import orjson
+from flask import Flask, render_template, request, jsonify, session, send_file, send_from_directory
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
@@ -22,7 +26,12 @@ from app.models.trajectory import TrajectoryProcessor
 from app.models.excitation import ExcitationProcessor
 from app.models.analysis import MolecularAnalysis
 from app.utils.file_parser import FileParser
-from app.routes.dmabn_analysis import dmabn_bp
+from app.routes.dmabn_analysis import dmabn_bp, write_session_status
+from app.utils.data_processor import persist_viewer_payload, prepare_for_viewer_cached
+
+# Debug logging (and its string formatting) is skipped entirely in
+# production unless LOG_LEVEL=DEBUG is set
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
 
 # Configuration
 class Config:
@@ -58,8 +67,32 @@ def validate_file(file):
     
     return {'valid': True, 'type': file_type}
 
+# orjson-backed JSON provider: jsonify() serializes in C and handles
+# numpy arrays/scalars natively, so routes never pay for .tolist() or
+# Python-level encoding on the large trajectory payloads
+class OrjsonJSONProvider(JSONProvider):
+    _OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=self._OPTS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if args and kwargs:
+            raise TypeError('response() takes either args or kwargs, not both')
+        if len(args) == 1:
+            obj = args[0]
+        else:
+            obj = args or kwargs
+        # Bytes go straight into the response body, no decode/encode round trip
+        body = orjson.dumps(obj, default=str, option=self._OPTS)
+        return self._app.response_class(body, mimetype='application/json')
+
 # Create Flask app
 app = Flask(__name__, template_folder='app/templates', static_folder='app/static')
+app.json = OrjsonJSONProvider(app)
 app.secret_key = 'toto'
 app.config.from_object(Config)
 app.register_blueprint(dmabn_bp)
@@ -71,6 +104,15 @@ app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 # Enable CORS
 CORS(app)
 
+# Gzip responses: the JSON payloads are repetitive decimal floats, so
+# even level 1 cuts wire bytes 5-10x for a trivial encode cost. Routes
+# that already set Content-Encoding (precompressed .json.gz) are
+# skipped automatically.
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/csv',
+                                    'chemical/x-xyz', 'text/html']
+app.config['COMPRESS_LEVEL'] = 1
+Compress(app)
+
 # Ensure directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['PROCESSED_FOLDER'], exist_ok=True)
@@ -142,7 +184,7 @@ def upload_files():
             return jsonify({'error': 'No files selected'}), 400
         
         # Generate unique session ID
-        session_id = str(uuid.uuid4())
+        session_id = uuid.uuid4().hex
         session['session_id'] = session_id
 
         # Capture molecule type from form data
@@ -268,7 +310,20 @@ def process_data():
                 'molecule_type': molecule_type,
                 'processed_at': datetime.now().isoformat()
             }, f, default=str)
-        
+
+        # Also store the trajectory in binary columnar form so analysis
+        # routes can skip JSON parsing entirely
+        trajectory_npz = os.path.join(app.config['PROCESSED_FOLDER'], f"{session_id}_trajectory.npz")
+        trajectory_processor.frames_to_npz(trajectory_data, trajectory_npz)
+
+        # Seed the status sidecar so polling never reloads the full cache
+        write_session_status(app.config['PROCESSED_FOLDER'], session_id, {
+            'has_trajectory_data': bool(trajectory_data),
+            'has_dmabn_analysis': False,
+            'has_custom_fragments': False,
+            'ready_for_analysis': bool(trajectory_data)
+        })
+
         return jsonify({
             'success': True,
             'trajectory_frames': len(trajectory_data) if trajectory_data else 0,
@@ -331,15 +386,24 @@ def get_data(session_id):
     """Get processed data for a session"""
     try:
         processed_file = os.path.join(app.config['PROCESSED_FOLDER'], f"{session_id}_processed.json")
-        
+
         if not os.path.exists(processed_file):
             return jsonify({'error': 'Processed data not found'}), 404
-        
-        with open(processed_file, 'r') as f:
-            data = json.load(f)
-        
-        return jsonify(data)
-        
+
+        # Serve the persisted gzip payload: built once per processing run,
+        # then each request is a sendfile of precompressed bytes and
+        # conditional=True answers repeat loads with 304
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            cache_file = persist_viewer_payload(session_id, app.config['PROCESSED_FOLDER'])
+            response = send_file(cache_file, mimetype='application/json', conditional=True)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers['Cache-Control'] = 'private, max-age=300'
+            return response
+
+        # Clients without gzip support get the identical payload, just
+        # uncompressed; the endpoint serves one shape regardless of headers
+        return jsonify(prepare_for_viewer_cached(session_id, app.config['PROCESSED_FOLDER']))
+
     except Exception as e:
         app.logger.error(f"Data retrieval error: {str(e)}")
         return jsonify({'error': f'Failed to retrieve data: {str(e)}'}), 500
@@ -487,7 +551,7 @@ def load_example_data(example_id):
         if not os.path.exists(source_path):
             return jsonify({'success': False, 'error': 'Sample data not found'}), 404
 
-        session_id = str(uuid.uuid4())
+        session_id = uuid.uuid4().hex
         session['session_id'] = session_id
         session['molecule_type'] = 'dmabn'  # Set molecule type in session
         target_folder = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
@@ -534,6 +598,16 @@ def load_example_data(example_id):
                 'processed_at': datetime.now().isoformat()
             }, f, default=str)
 
+        trajectory_npz = os.path.join(app.config['PROCESSED_FOLDER'], f"{session_id}_trajectory.npz")
+        trajectory_processor.frames_to_npz(trajectory_data, trajectory_npz)
+
+        write_session_status(app.config['PROCESSED_FOLDER'], session_id, {
+            'has_trajectory_data': bool(trajectory_data),
+            'has_dmabn_analysis': False,
+            'has_custom_fragments': False,
+            'ready_for_analysis': bool(trajectory_data)
+        })
+
         return jsonify({'success': True, 'session_id': session_id})
 
     except Exception as e:
@@ -1,13 +1,142 @@
 # DMABN-specific geometry analysis
 
+import math
+
 import numpy as np
 import json
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Numba is optional: when available the tight per-frame math runs as a
+# compiled parallel kernel, otherwise the NumPy batch path is used
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# JAX is also optional: jit(vmap(...)) batches the per-frame analysis
+# into one compiled kernel and picks up a GPU automatically when present
+try:
+    import jax
+    import jax.numpy as jnp
+    JAX_AVAILABLE = True
+except ImportError:
+    JAX_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _geometry_kernel(coords, i1, i2, i3, amino_c0, amino_c1,
+                        amino_n, nitrile_c, ring_connection,
+                        out_twist, out_distance, out_pyramid):
+        """
+        Compiled kernel for the cross/dot-product geometry parameters.
+
+        i1/i2/i3 are the ring atom indices spanning the ring plane. The
+        SVD-based parameters (planarity, nitrile angle) stay on the
+        NumPy path since they are not plain FMA arithmetic.
+        """
+        n_frames = coords.shape[0]
+
+        for f in prange(n_frames):
+            # Twist angle: methyl-methyl vector vs ring plane
+            p1 = coords[f, i1]
+            ring_normal = np.cross(coords[f, i2] - p1, coords[f, i3] - p1)
+            ring_normal = ring_normal / np.linalg.norm(ring_normal)
+
+            methyl = coords[f, amino_c1] - coords[f, amino_c0]
+            methyl = methyl / np.linalg.norm(methyl)
+
+            dot_product = abs(np.dot(methyl, ring_normal))
+            if dot_product > 1.0:
+                dot_product = 1.0
+            out_twist[f] = abs(90.0 - math.degrees(math.acos(dot_product)))
+
+            # Donor (amino N) to acceptor (nitrile C) distance
+            out_distance[f] = np.linalg.norm(
+                coords[f, amino_n] - coords[f, nitrile_c])
+
+            # Amino nitrogen pyramidalization
+            c0 = coords[f, ring_connection]
+            c1 = coords[f, amino_c0]
+            c2 = coords[f, amino_c1]
+            plane_normal = np.cross(c1 - c0, c2 - c0)
+            plane_normal = plane_normal / np.linalg.norm(plane_normal)
+
+            n_vector = coords[f, amino_n] - (c0 + c1 + c2) / 3.0
+            out_of_plane = np.dot(n_vector, plane_normal)
+            in_plane = np.linalg.norm(n_vector - out_of_plane * plane_normal)
+
+            if in_plane > 1e-6:
+                out_pyramid[f] = math.degrees(
+                    math.atan(abs(out_of_plane) / in_plane))
+            elif abs(out_of_plane) > 1e-6:
+                out_pyramid[f] = 90.0
+            else:
+                out_pyramid[f] = 0.0
+
+@lru_cache(maxsize=8)
+def _build_jax_batch_fn(ring_indices, amino_carbons, amino_n,
+                        nitrile_c, nitrile_n, ring_connection):
+    """
+    Build the jitted, vmapped per-frame analyzer for one fragment mapping.
+
+    Cached at module level so every analyzer instance (routes create one
+    per request) shares the compiled function instead of retracing it.
+    """
+    ring_idx = jnp.array(ring_indices)
+    if len(ring_indices) >= 6:
+        i1, i2, i3 = ring_indices[0], ring_indices[2], ring_indices[4]
+    else:
+        i1, i2, i3 = ring_indices[0], ring_indices[1], ring_indices[2]
+
+    def frame_params(c):
+        """Geometry parameters for a single (n_atoms, 3) frame"""
+        # Ring plane from three spanning atoms (twist reference)
+        cross_normal = jnp.cross(c[i2] - c[i1], c[i3] - c[i1])
+        cross_normal = cross_normal / jnp.linalg.norm(cross_normal)
+
+        # Twist: methyl-methyl vector vs ring plane
+        methyl = c[amino_carbons[1]] - c[amino_carbons[0]]
+        methyl = methyl / jnp.linalg.norm(methyl)
+        dot_product = jnp.clip(jnp.abs(jnp.dot(methyl, cross_normal)), 0.0, 1.0)
+        twist = jnp.abs(90.0 - jnp.degrees(jnp.arccos(dot_product)))
+
+        # Best-fit ring plane via SVD (planarity + nitrile angle)
+        ring_coords = c[ring_idx]
+        centered = ring_coords - jnp.mean(ring_coords, axis=0)
+        _, _, vh = jnp.linalg.svd(centered, full_matrices=False)
+        fit_normal = vh[-1]
+        planarity = jnp.max(jnp.abs(centered @ fit_normal))
+
+        nitrile = c[nitrile_n] - c[nitrile_c]
+        nitrile = nitrile / jnp.linalg.norm(nitrile)
+        cos_angle = jnp.clip(jnp.dot(nitrile, fit_normal), -1.0, 1.0)
+        nitrile_angle = 90.0 - jnp.degrees(jnp.arccos(jnp.abs(cos_angle)))
+
+        # Donor-acceptor distance
+        da_distance = jnp.linalg.norm(c[amino_n] - c[nitrile_c])
+
+        # Amino pyramidalization
+        c0, c1, c2 = c[ring_connection], c[amino_carbons[0]], c[amino_carbons[1]]
+        plane_normal = jnp.cross(c1 - c0, c2 - c0)
+        plane_normal = plane_normal / jnp.linalg.norm(plane_normal)
+        n_vector = c[amino_n] - (c0 + c1 + c2) / 3.0
+        out_of_plane = jnp.dot(n_vector, plane_normal)
+        in_plane = jnp.linalg.norm(n_vector - out_of_plane * plane_normal)
+        pyramid = jnp.where(
+            in_plane > 1e-6,
+            jnp.degrees(jnp.arctan(jnp.abs(out_of_plane) / jnp.maximum(in_plane, 1e-12))),
+            jnp.where(jnp.abs(out_of_plane) > 1e-6, 90.0, 0.0))
+
+        return twist, planarity, nitrile_angle, da_distance, pyramid
+
+    return jax.jit(jax.vmap(frame_params))
+
 class DMABNGeometryAnalyzer:
     """
     Analyze DMABN molecular geometry parameters including:
@@ -211,20 +340,110 @@ class DMABNGeometryAnalyzer:
                 first_frame['atoms'], first_frame['coords']
             )
         
-        self.geometry_data = []
-        
+        # Batched NumPy path: one vectorized pass over all frames instead
+        # of per-frame Python dispatches
+        self.geometry_data = self._analyze_frames_batch(trajectory_data)
+
+        if self.geometry_data is None:
+            # Fall back to the per-frame loop (e.g. varying atom counts)
+            self.geometry_data = self._analyze_frames_loop(trajectory_data)
+
+        # Generate analysis metadata
+        self.analysis_metadata = self._generate_metadata()
+
+        # Precompute the summary the analyze endpoint returns, so repeat
+        # responses never re-derive counts or re-slice key frames
+        key_frames = self.analysis_metadata['key_frames']
+        response_summary = {
+            'total_frames': self.analysis_metadata['total_frames'],
+            'successful_frames': self.analysis_metadata['successful_frames'],
+            'key_frames_count': len(key_frames),
+            'top_key_frames': key_frames[:5],
+            'parameters_analyzed': ['twist_angle', 'ring_planarity',
+                                    'ring_nitrile_angle',
+                                    'donor_acceptor_distance',
+                                    'amino_pyramidalization']
+        }
+
+        return {
+            'geometry_data': self.geometry_data,
+            'fragment_mapping': self.fragment_mapping,
+            'metadata': self.analysis_metadata,
+            'response_summary': response_summary
+        }
+
+    def _analyze_frames_batch(self, trajectory_data: List[Dict]) -> Optional[List[Dict]]:
+        """
+        Vectorized geometry analysis over a whole trajectory.
+
+        Stacks all frames into a (n_frames, n_atoms, 3) array and computes
+        every parameter with NumPy ufuncs along the frame axis.
+
+        Returns:
+            Per-frame geometry dictionaries, or None if the trajectory
+            cannot be stacked (inconsistent atom counts).
+        """
+        try:
+            n_atoms = len(trajectory_data[0]['coords'])
+            if any(len(frame['coords']) != n_atoms for frame in trajectory_data):
+                return None
+
+            coords = np.asarray([frame['coords'] for frame in trajectory_data],
+                                dtype=np.float64)
+            times_fs = np.asarray([
+                frame.get('time_fs', idx * 0.5)
+                for idx, frame in enumerate(trajectory_data)
+            ], dtype=np.float64)
+
+            if JAX_AVAILABLE:
+                (twist, planarity, nitrile_angle,
+                da_distance, pyramidalization) = self._run_jax_batch(coords)
+            else:
+                planarity, ring_normal = self._batch_ring_planarity(coords)
+                nitrile_angle = self._batch_ring_nitrile_angle(coords, ring_normal)
+
+                if NUMBA_AVAILABLE:
+                    twist, da_distance, pyramidalization = self._run_geometry_kernel(coords)
+                else:
+                    twist = self._batch_twist_angle(coords)
+                    da_distance = self._batch_donor_acceptor_distance(coords)
+                    pyramidalization = self._batch_amino_pyramidalization(coords)
+
+            geometry_data = []
+            for idx in range(coords.shape[0]):
+                geometry_data.append({
+                    'frame_number': idx,
+                    'time_fs': float(times_fs[idx]),
+                    'time_ps': float(times_fs[idx]) / 1000.0,
+                    'twist_angle': float(twist[idx]),
+                    'ring_planarity': float(planarity[idx]),
+                    'ring_nitrile_angle': float(nitrile_angle[idx]),
+                    'donor_acceptor_distance': float(da_distance[idx]),
+                    'amino_pyramidalization': float(pyramidalization[idx])
+                })
+
+            return geometry_data
+
+        except Exception as e:
+            logger.warning(f"Batched analysis failed, falling back to frame loop: {e}")
+            return None
+
+    def _analyze_frames_loop(self, trajectory_data: List[Dict]) -> List[Dict]:
+        """Per-frame analysis loop (fallback path)"""
+        geometry_data = []
+
         for frame_idx, frame in enumerate(trajectory_data):
             try:
                 geometry_params = self.analyze_frame(
                     frame['atoms'], frame['coords'], frame.get('time_fs', frame_idx * 0.5)
                 )
                 geometry_params['frame_number'] = frame_idx
-                self.geometry_data.append(geometry_params)
-                
+                geometry_data.append(geometry_params)
+
             except Exception as e:
                 logger.warning(f"Failed to analyze frame {frame_idx}: {e}")
                 # Add placeholder data to maintain frame indexing
-                self.geometry_data.append({
+                geometry_data.append({
                     'frame_number': frame_idx,
                     'time_fs': frame.get('time_fs', frame_idx * 0.5),
                     'twist_angle': np.nan,
@@ -232,15 +451,148 @@ class DMABNGeometryAnalyzer:
                     'ring_nitrile_angle': np.nan,
                     'analysis_failed': True
                 })
-        
-        # Generate analysis metadata
-        self.analysis_metadata = self._generate_metadata()
-        
-        return {
-            'geometry_data': self.geometry_data,
-            'fragment_mapping': self.fragment_mapping,
-            'metadata': self.analysis_metadata
-        }
+
+        return geometry_data
+
+    def _run_jax_batch(self, coords: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Analyze all frames through a jitted, vmapped per-frame function"""
+        batch_fn = self._get_jax_batch_fn()
+        results = batch_fn(jnp.asarray(coords))
+        # DeviceArrays back to NumPy for the JSON layer
+        return tuple(np.asarray(r, dtype=np.float64) for r in results)
+
+    def _get_jax_batch_fn(self):
+        """
+        Get the compiled batch analyzer for the current fragment mapping.
+
+        The builder is cached at module level, so fresh analyzer
+        instances (one per request/worker call) reuse the compiled
+        function instead of retracing it.
+        """
+        return _build_jax_batch_fn(
+            tuple(self.fragment_mapping['benzene_ring']),
+            tuple(self.fragment_mapping['amino_carbons']),
+            self.fragment_mapping['amino_nitrogen'],
+            self.fragment_mapping['nitrile_carbon'],
+            self.fragment_mapping['nitrile_nitrogen'],
+            self.fragment_mapping['ring_amino_bond'])
+
+    def _run_geometry_kernel(self, coords: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Run the compiled Numba kernel over all frames"""
+        ring_indices = self.fragment_mapping['benzene_ring']
+        amino_carbons = self.fragment_mapping['amino_carbons']
+
+        if len(ring_indices) >= 6:
+            i1, i2, i3 = ring_indices[0], ring_indices[2], ring_indices[4]
+        else:
+            i1, i2, i3 = ring_indices[0], ring_indices[1], ring_indices[2]
+
+        n_frames = coords.shape[0]
+        twist = np.empty(n_frames, dtype=np.float64)
+        distance = np.empty(n_frames, dtype=np.float64)
+        pyramid = np.empty(n_frames, dtype=np.float64)
+
+        _geometry_kernel(
+            np.ascontiguousarray(coords), i1, i2, i3,
+            amino_carbons[0], amino_carbons[1],
+            self.fragment_mapping['amino_nitrogen'],
+            self.fragment_mapping['nitrile_carbon'],
+            self.fragment_mapping['ring_amino_bond'],
+            twist, distance, pyramid)
+
+        return twist, distance, pyramid
+
+    def _batch_twist_angle(self, coords: np.ndarray) -> np.ndarray:
+        """Vectorized twist angle (methyl-methyl vector vs ring plane)"""
+        ring_indices = self.fragment_mapping['benzene_ring']
+        amino_carbons = self.fragment_mapping['amino_carbons']
+
+        ring_coords = coords[:, ring_indices, :]
+        if ring_coords.shape[1] >= 6:
+            p1, p2, p3 = ring_coords[:, 0], ring_coords[:, 2], ring_coords[:, 4]
+        else:
+            p1, p2, p3 = ring_coords[:, 0], ring_coords[:, 1], ring_coords[:, 2]
+
+        ring_normal = np.cross(p2 - p1, p3 - p1)
+        ring_normal /= np.linalg.norm(ring_normal, axis=1, keepdims=True)
+
+        methyl_vector = coords[:, amino_carbons[1]] - coords[:, amino_carbons[0]]
+        methyl_vector /= np.linalg.norm(methyl_vector, axis=1, keepdims=True)
+
+        dot_product = np.einsum('fi,fi->f', methyl_vector, ring_normal)
+        angle_with_normal = np.degrees(np.arccos(np.clip(np.abs(dot_product), 0.0, 1.0)))
+
+        return np.abs(90.0 - angle_with_normal)
+
+    def _batch_ring_planarity(self, coords: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized ring planarity (max deviation from the best-fit plane).
+
+        Returns the deviations together with the per-frame best-fit plane
+        normals so other parameters can reuse them.
+        """
+        ring_indices = self.fragment_mapping['benzene_ring']
+        ring_coords = coords[:, ring_indices, :]
+
+        centroid = np.mean(ring_coords, axis=1, keepdims=True)
+        centered = ring_coords - centroid
+
+        # Batched SVD: last right-singular vector is the plane normal
+        _, _, vh = np.linalg.svd(centered)
+        normal = vh[:, -1, :]
+
+        deviations = np.abs(np.einsum('fai,fi->fa', centered, normal))
+        return deviations.max(axis=1), normal
+
+    def _batch_ring_nitrile_angle(self, coords: np.ndarray,
+                                ring_normal: np.ndarray) -> np.ndarray:
+        """Vectorized angle between the nitrile group and the ring plane"""
+        nitrile_c = self.fragment_mapping['nitrile_carbon']
+        nitrile_n = self.fragment_mapping['nitrile_nitrogen']
+
+        nitrile_vector = coords[:, nitrile_n] - coords[:, nitrile_c]
+        nitrile_vector /= np.linalg.norm(nitrile_vector, axis=1, keepdims=True)
+
+        cos_angle = np.clip(np.einsum('fi,fi->f', nitrile_vector, ring_normal), -1.0, 1.0)
+        angle_with_normal = np.degrees(np.arccos(np.abs(cos_angle)))
+
+        return 90.0 - angle_with_normal
+
+    def _batch_donor_acceptor_distance(self, coords: np.ndarray) -> np.ndarray:
+        """Vectorized donor (amino N) to acceptor (nitrile C) distance"""
+        amino_n = self.fragment_mapping['amino_nitrogen']
+        nitrile_c = self.fragment_mapping['nitrile_carbon']
+
+        return np.linalg.norm(coords[:, amino_n] - coords[:, nitrile_c], axis=1)
+
+    def _batch_amino_pyramidalization(self, coords: np.ndarray) -> np.ndarray:
+        """Vectorized pyramidalization angle of the amino nitrogen"""
+        amino_n = self.fragment_mapping['amino_nitrogen']
+        amino_carbons = self.fragment_mapping['amino_carbons']
+        ring_connection = self.fragment_mapping['ring_amino_bond']
+
+        n_coord = coords[:, amino_n]
+        connected = coords[:, [ring_connection, amino_carbons[0], amino_carbons[1]], :]
+
+        v1 = connected[:, 1] - connected[:, 0]
+        v2 = connected[:, 2] - connected[:, 0]
+        plane_normal = np.cross(v1, v2)
+        plane_normal /= np.linalg.norm(plane_normal, axis=1, keepdims=True)
+
+        n_vector = n_coord - np.mean(connected, axis=1)
+        out_of_plane = np.einsum('fi,fi->f', n_vector, plane_normal)
+        in_plane = np.linalg.norm(
+            n_vector - out_of_plane[:, None] * plane_normal, axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pyramidalization = np.degrees(np.arctan(np.abs(out_of_plane) / in_plane))
+
+        # Degenerate frames where the nitrogen sits on the plane centroid
+        pyramidalization = np.where(
+            in_plane > 1e-6, pyramidalization,
+            np.where(np.abs(out_of_plane) > 1e-6, 90.0, 0.0))
+
+        return pyramidalization
     
     def analyze_frame(self, atoms: List[str], coords: List[List[float]], 
                     time_fs: float) -> Dict:
@@ -787,6 +1139,49 @@ class DMABNGeometryAnalyzer:
         
         return key_frames[:20]  # Return top 20 key frames
     
+    def iter_export(self, output_format: str = 'json'):
+        """
+        Stream geometry analysis results as string chunks.
+
+        Yields the export piecewise in joined blocks of frames, so
+        callers can send it as a chunked HTTP response without holding
+        the whole serialized payload in memory while keeping the number
+        of yields (and writer dispatches) small.
+
+        Args:
+            output_format: 'json' or 'csv'
+        """
+        block_size = 1024
+
+        if output_format == 'json':
+            yield '{"geometry_data": ['
+            for start in range(0, len(self.geometry_data), block_size):
+                block = self.geometry_data[start:start + block_size]
+                yield (',' if start else '') + ','.join(
+                    json.dumps(frame, default=str) for frame in block)
+            yield '], "fragment_mapping": '
+            yield json.dumps(self.fragment_mapping, default=str)
+            yield ', "metadata": '
+            yield json.dumps(self.analysis_metadata, default=str)
+            yield '}'
+
+        elif output_format == 'csv':
+            yield ("frame,time_fs,time_ps,twist_angle,ring_planarity,"
+                "ring_nitrile_angle,donor_acceptor_distance,amino_pyramidalization\n")
+
+            for start in range(0, len(self.geometry_data), block_size):
+                block = self.geometry_data[start:start + block_size]
+                yield ''.join(
+                    f"{frame['frame_number']},{frame['time_fs']:.2f},"
+                    f"{frame['time_ps']:.6f},{frame['twist_angle']:.4f},"
+                    f"{frame['ring_planarity']:.4f},{frame['ring_nitrile_angle']:.4f},"
+                    f"{frame['donor_acceptor_distance']:.4f},"
+                    f"{frame['amino_pyramidalization']:.4f}\n"
+                    for frame in block)
+
+        else:
+            raise ValueError(f"Unsupported export format: {output_format}")
+
     def export_analysis(self, output_format: str = 'json') -> str:
         """
         Export geometry analysis results.
@@ -1,36 +1,57 @@
 # Trajectory data processing
 
+import os
+from itertools import chain
 import numpy as np
 from typing import List, Dict, Optional
 
 class TrajectoryProcessor:
     """Process XYZ trajectory files for molecular dynamics visualization"""
-    
+
     def __init__(self):
         self.timestep_fs = 0.5  # 0.5 fs per frame
-    
+
     def read_trajectory(self, xyz_file: str) -> List[Dict]:
         """
         Read XYZ trajectory file and return structured data
-        
+
         Args:
             xyz_file: Path to XYZ trajectory file
-            
+
         Returns:
             List of trajectory frames with atoms, coordinates, and metadata
         """
         try:
+            # Re-opening the same trajectory is common in a web viewer, so
+            # keep a compressed binary cache next to the XYZ file and skip
+            # text parsing entirely when it is still fresh
+            cached_frames = self.load_trajectory_cache(xyz_file)
+            if cached_frames is not None:
+                return cached_frames
+
             frames = []
-            
+
             with open(xyz_file, 'r') as f:
                 lines = f.readlines()
-            
+
             i = 0
             frame_count = 0
-            
+
             print(f"Reading trajectory file: {xyz_file}")
             print(f"Total lines: {len(lines)}")
-            
+
+            # Uniform trajectories take the bulk path: every float goes
+            # through NumPy's C parser (fast from_chars-style conversion)
+            # instead of one interpreter float() call per coordinate
+            fast_frames = self._read_frames_fast(lines)
+            if fast_frames is not None:
+                print(f"Successfully read {len(fast_frames)} trajectory frames")
+                if fast_frames:
+                    print(f"Time range: 0 - {fast_frames[-1]['time_fs']:.1f} fs ({fast_frames[-1]['time_ps']:.3f} ps)")
+                    print(f"Atoms per frame: {fast_frames[0]['n_atoms']}")
+                self.save_trajectory_cache(xyz_file, fast_frames)
+                return fast_frames
+
             while i < len(lines):
                 try:
                     # Read number of atoms
@@ -84,13 +105,170 @@ class TrajectoryProcessor:
             print(f"Successfully read {len(frames)} trajectory frames")
             print(f"Time range: 0 - {frames[-1]['time_fs']:.1f} fs ({frames[-1]['time_ps']:.3f} ps)")
             print(f"Atoms per frame: {frames[0]['n_atoms'] if frames else 0}")
-            
+
+            self.save_trajectory_cache(xyz_file, frames)
+
             return frames
-            
+
         except Exception as e:
             print(f"Error reading trajectory file: {e}")
             raise
-    
+
+    def _read_frames_fast(self, lines: List[str]) -> Optional[List[Dict]]:
+        """
+        Bulk-parse a constant-atom-count trajectory in one pass.
+
+        Coordinate rows for all frames are concatenated and converted by
+        a single np.loadtxt call; the element list from the first frame
+        is shared across frames (invariant in MD). Returns None when the
+        file is not uniformly structured so the caller can fall back to
+        the per-line loop.
+        """
+        if not lines:
+            return []
+
+        # Ignore trailing blank lines when checking the frame stride
+        n_lines = len(lines)
+        while n_lines and not lines[n_lines - 1].strip():
+            n_lines -= 1
+
+        try:
+            n_atoms = int(lines[0].strip())
+        except ValueError:
+            return None
+
+        stride = n_atoms + 2
+        if n_atoms <= 0 or n_lines % stride != 0:
+            return None
+
+        header_starts = range(0, n_lines, stride)
+        try:
+            if any(int(lines[i].strip()) != n_atoms for i in header_starts):
+                return None
+        except ValueError:
+            return None
+
+        # Streaming slices into loadtxt lets it allocate the full
+        # coordinate block once, with no intermediate line list or
+        # joined copy of the file
+        coord_iter = chain.from_iterable(
+            lines[i + 2:i + stride] for i in header_starts)
+        try:
+            table = np.loadtxt(coord_iter, dtype=np.float64,
+                                usecols=(1, 2, 3), ndmin=2)
+        except ValueError:
+            return None
+
+        n_frames = n_lines // stride
+        if table.shape[0] != n_frames * n_atoms:
+            return None
+        coords = table.reshape(n_frames, n_atoms, 3)
+
+        atoms = [line.split(None, 1)[0] for line in lines[2:2 + n_atoms]]
+
+        return [{
+            'frame_number': f,
+            'atoms': atoms,
+            'coords': coords[f].tolist(),
+            'comment': lines[f * stride + 1].strip(),
+            'time_fs': f * self.timestep_fs,
+            'time_ps': f * self.timestep_fs / 1000.0,
+            'n_atoms': n_atoms
+        } for f in range(n_frames)]
+
+    def load_trajectory_cache(self, xyz_file: str) -> Optional[List[Dict]]:
+        """
+        Load frames from the binary cache next to an XYZ file, if current
+
+        Args:
+            xyz_file: Path to XYZ trajectory file
+
+        Returns:
+            List of trajectory frames, or None if no usable cache exists
+        """
+        cache_file = xyz_file + '.npz'
+
+        try:
+            if not os.path.exists(cache_file):
+                return None
+
+            # Stale cache (XYZ re-uploaded) must be ignored
+            if os.path.getmtime(cache_file) < os.path.getmtime(xyz_file):
+                return None
+
+            frames = self.frames_from_npz(cache_file)
+            print(f"Loaded {len(frames)} frames from binary cache: {cache_file}")
+            return frames
+
+        except Exception as e:
+            print(f"Warning: Could not load trajectory cache: {e}")
+            return None
+
+    def save_trajectory_cache(self, xyz_file: str, frames: List[Dict]):
+        """Save parsed frames as a compressed float32 binary cache"""
+
+        cache_file = xyz_file + '.npz'
+
+        try:
+            if self.frames_to_npz(frames, cache_file):
+                print(f"Saved trajectory cache: {cache_file}")
+
+        except Exception as e:
+            print(f"Warning: Could not save trajectory cache: {e}")
+
+    def frames_to_npz(self, frames: List[Dict], npz_file: str) -> bool:
+        """
+        Write frames to a compressed npz archive in SoA layout
+
+        Args:
+            frames: List of trajectory frames
+            npz_file: Destination path
+
+        Returns:
+            True if the archive was written
+        """
+        if not frames:
+            return False
+
+        # Only storable when the atom list is constant across frames
+        n_atoms = frames[0]['n_atoms']
+        if any(frame['n_atoms'] != n_atoms for frame in frames):
+            print("Skipping binary trajectory store: inconsistent atom counts")
+            return False
+
+        # float32 keeps ~4 decimal Angstrom precision at half the size
+        coords = np.array([frame['coords'] for frame in frames], dtype=np.float32)
+        times_fs = np.array([frame['time_fs'] for frame in frames], dtype=np.float32)
+        atoms = np.array(frames[0]['atoms'])
+        comments = np.array([frame.get('comment', '') for frame in frames])
+
+        np.savez_compressed(npz_file, coords=coords, atoms=atoms,
+                            times_fs=times_fs, comments=comments)
+        return True
+
+    def frames_from_npz(self, npz_file: str) -> List[Dict]:
+        """Rebuild trajectory frames from an npz archive written by frames_to_npz"""
+
+        data = np.load(npz_file, allow_pickle=False)
+        coords = data['coords']  # (n_frames, n_atoms, 3) float32
+        atoms = [str(a) for a in data['atoms']]
+        times_fs = data['times_fs']
+        comments = [str(c) for c in data['comments']]
+
+        frames = []
+        for i in range(coords.shape[0]):
+            frames.append({
+                'frame_number': i,
+                'atoms': atoms,
+                'coords': coords[i].tolist(),
+                'comment': comments[i] if i < len(comments) else "",
+                'time_fs': float(times_fs[i]),
+                'time_ps': float(times_fs[i]) / 1000.0,
+                'n_atoms': len(atoms)
+            })
+
+        return frames
+
     def get_trajectory_statistics(self, frames: List[Dict]) -> Dict:
         """Calculate trajectory statistics"""
         if not frames:
@@ -252,11 +430,12 @@ class TrajectoryProcessor:
         """Optimize trajectory data for web viewer"""
         if len(frames) <= max_frames:
             return frames
-        
-        # Sample frames evenly
-        step = len(frames) // max_frames
-        optimized_frames = frames[::step]
-        
+
+        # Sample frames evenly: linspace gives exactly max_frames indices
+        # and always includes the first and last frame, unlike [::step]
+        indices = np.linspace(0, len(frames) - 1, max_frames, dtype=np.int64)
+        optimized_frames = [frames[i] for i in indices]
+
         print(f"Optimized trajectory: {len(frames)} → {len(optimized_frames)} frames")
-        
+
         return optimized_frames
\ No newline at end of file
@@ -1,16 +1,284 @@
 # API routes for DMABN geometry analysis
 
 import os
-import json
+import gzip
+import hashlib
 import logging
-from flask import Blueprint, request, jsonify, current_app, session
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import orjson
+from flask import Blueprint, request, jsonify, current_app, session, send_file
 from app.models.dmabn_analyzer import DMABNGeometryAnalyzer
+from app.models.trajectory import TrajectoryProcessor
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint for DMABN analysis routes
 dmabn_bp = Blueprint('dmabn_analysis', __name__, url_prefix='/api/dmabn')
 
+# Fragments a mapping must define for the geometry parameters to be computable
+REQUIRED_FRAGMENTS = frozenset({
+    'benzene_ring', 'amino_nitrogen', 'amino_carbons',
+    'nitrile_carbon', 'nitrile_nitrogen'
+})
+
+# Analysis jobs run in worker processes so Flask threads stay free to
+# serve reads while a long trajectory is being analyzed
+_EXECUTOR = None
+_JOBS = {}
+
+def _get_executor():
+    """Create the worker pool on first use, not at import time"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _EXECUTOR
+
+@lru_cache(maxsize=32)
+def _read_session(session_file, mtime):
+    """Parse a session cache file; mtime in the key invalidates stale entries"""
+    with open(session_file, 'rb') as f:
+        return orjson.loads(f.read())
+
+def _load_session(session_file):
+    """Load a session cache file (orjson is several times faster than json)"""
+    return _read_session(session_file, os.path.getmtime(session_file))
+
+def _save_session(session_file, cached_data):
+    """
+    Save a session cache file with orjson, atomically.
+
+    The analysis worker process writes these files while Flask threads
+    poll them, so publish via a writer-private temp file and os.replace
+    (the stream_save / export_analysis pattern) — a truncating write in
+    place would let a concurrent reader see empty or partial bytes and
+    fail in orjson.loads.
+    """
+    tmp = f"{session_file}.{uuid.uuid4().hex}.part"
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(orjson.dumps(cached_data, default=str,
+                                 option=orjson.OPT_SERIALIZE_NUMPY))
+        os.replace(tmp, session_file)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    # Drop cached parses so readers never see a pre-write snapshot
+    _read_session.cache_clear()
+
+def _load_session_or_none(session_file):
+    """EAFP load: ask forgiveness instead of paying an exists() stat first"""
+    try:
+        return _load_session(session_file)
+    except FileNotFoundError:
+        return None
+
+def write_session_status(processed_dir, session_id, updates):
+    """
+    Merge updates into the small {session_id}_status.json sidecar.
+
+    The status route reads only this file, so polling never has to load
+    the full trajectory cache.
+    """
+    status_file = os.path.join(processed_dir, f"{session_id}_status.json")
+    status = _load_session_or_none(status_file) or {}
+    status.update(updates)
+    _save_session(status_file, status)
+
+def _export_file(processed_dir, session_id, format):
+    """On-disk export artifact, rebuilt only when the analysis changes"""
+    return os.path.join(processed_dir, f"{session_id}_export.{format}")
+
+def _invalidate_exports(processed_dir, session_id):
+    """Remove stale export artifacts after the analysis inputs change"""
+    for format in ('json', 'csv'):
+        try:
+            os.remove(_export_file(processed_dir, session_id, format))
+        except FileNotFoundError:
+            pass
+
+def _load_trajectory(processed_dir, session_id, cached_data=None):
+    """
+    Load trajectory frames, preferring the binary npz store over the
+    JSON cache. Falls back to the 'trajectory' key of the processed
+    JSON for sessions created before the npz store existed.
+    """
+    trajectory_npz = os.path.join(processed_dir, f"{session_id}_trajectory.npz")
+    try:
+        return TrajectoryProcessor().frames_from_npz(trajectory_npz)
+    except FileNotFoundError:
+        pass
+
+    if cached_data is None:
+        session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
+        cached_data = _load_session(session_file)
+
+    return cached_data.get('trajectory', [])
+
+def _analysis_key(processed_dir, session_id, method, fragment_mapping):
+    """
+    Cheap identity for an analysis run: calculation method, the on-disk
+    trajectory's mtime+size, and the fragment mapping. Matching keys mean
+    re-running analyze_trajectory would reproduce the stored results.
+    """
+    trajectory_npz = os.path.join(processed_dir, f"{session_id}_trajectory.npz")
+    session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
+    try:
+        stat = os.stat(trajectory_npz)
+    except FileNotFoundError:
+        stat = os.stat(session_file)
+
+    mapping_digest = hashlib.blake2b(
+        orjson.dumps(fragment_mapping, option=orjson.OPT_SORT_KEYS),
+        digest_size=8).hexdigest()
+
+    return f"{method}:{stat.st_mtime_ns}:{stat.st_size}:{mapping_digest}"
+
+def _analysis_file(processed_dir, session_id):
+    """Analysis results are stored beside (not inside) the trajectory cache"""
+    return os.path.join(processed_dir, f"{session_id}_analysis.json")
+
+def _meta_file(processed_dir, session_id):
+    """Small per-session settings such as the calculation method preference"""
+    return os.path.join(processed_dir, f"{session_id}_meta.json")
+
+def _load_analysis(processed_dir, session_id):
+    """
+    Load analysis results, preferring the dedicated analysis file.
+    Falls back to the 'dmabn_analysis' key inside the processed cache
+    for sessions analyzed before the split.
+    """
+    analysis = _load_session_or_none(_analysis_file(processed_dir, session_id))
+    if analysis is not None:
+        return analysis
+
+    session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
+    cached_data = _load_session_or_none(session_file)
+    if cached_data is not None:
+        return cached_data.get('dmabn_analysis')
+
+    return None
+
+def _response_summary(analysis_results):
+    """
+    Summary block for the analyze endpoint, precomputed by
+    analyze_trajectory; derived on the fly for analyses saved before
+    the field existed.
+    """
+    summary = analysis_results.get('response_summary')
+    if summary is None:
+        metadata = analysis_results['metadata']
+        summary = {
+            'total_frames': metadata['total_frames'],
+            'successful_frames': metadata['successful_frames'],
+            'key_frames_count': len(metadata['key_frames']),
+            'top_key_frames': metadata['key_frames'][:5],
+            'parameters_analyzed': ['twist_angle', 'ring_planarity',
+                                    'ring_nitrile_angle',
+                                    'donor_acceptor_distance',
+                                    'amino_pyramidalization']
+        }
+    return summary
+
+def _analysis_response(session_id, analysis_results, cached=False):
+    """Serialize the analyze-endpoint payload with orjson"""
+    summary = _response_summary(analysis_results)
+    payload = {
+        'success': True,
+        'session_id': session_id,
+        'analysis_summary': {
+            'total_frames': summary['total_frames'],
+            'successful_frames': summary['successful_frames'],
+            'key_frames_count': summary['key_frames_count'],
+            'parameters_analyzed': summary['parameters_analyzed']
+        },
+        'fragment_mapping': analysis_results['fragment_mapping'],
+        'key_frames': summary['top_key_frames']
+    }
+    if cached:
+        payload['cached'] = True
+    body = orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    return current_app.response_class(body, mimetype='application/json')
+
+def _run_analysis(processed_dir, session_id, preferred_method,
+                    fragment_mapping, analysis_key):
+    """
+    Run the full trajectory analysis in a worker process.
+
+    Takes plain paths/values (no Flask objects) so it can cross the
+    process boundary; writes all results to the session's files and
+    returns the summary dict for the status endpoint.
+
+    Failures are recorded in the status sidecar from inside the worker:
+    the parent's _JOBS future lives in one process, and under a
+    multi-process server the poll that would settle it may never land
+    there, leaving analysis_running stuck on forever.
+    """
+    try:
+        return _run_analysis_steps(processed_dir, session_id,
+                                    preferred_method, fragment_mapping,
+                                    analysis_key)
+    except Exception as e:
+        logger.error("Analysis failed for session %s: %s", session_id, e,
+                        exc_info=True)
+        write_session_status(processed_dir, session_id, {
+            'analysis_running': False,
+            'analysis_error': str(e)
+        })
+        raise
+
+def _run_analysis_steps(processed_dir, session_id, preferred_method,
+                        fragment_mapping, analysis_key):
+    """Body of _run_analysis; separated so its error handling stays flat"""
+    trajectory_data = _load_trajectory(processed_dir, session_id)
+    if not trajectory_data:
+        raise ValueError('No trajectory data found in session.')
+
+    analyzer = DMABNGeometryAnalyzer()
+
+    if fragment_mapping:
+        analyzer.set_fragment_mapping(fragment_mapping)
+
+    if preferred_method == 'dihedral':
+        analyzer.switch_to_dihedral_method()
+    elif preferred_method == 'plane':
+        analyzer.switch_to_plane_method()
+
+    logger.debug("Starting analysis on all %d frames", len(trajectory_data))
+    analysis_results = analyzer.analyze_trajectory(trajectory_data)
+    logger.debug("Analysis complete, got %d results", len(analysis_results['geometry_data']))
+
+    # Save analysis results to their own file so the (much larger)
+    # trajectory cache is never re-serialized on analyze
+    _save_session(_analysis_file(processed_dir, session_id), analysis_results)
+
+    meta_file = _meta_file(processed_dir, session_id)
+    meta = _load_session_or_none(meta_file) or {}
+    meta['dmabn_analysis_key'] = analysis_key
+    _save_session(meta_file, meta)
+    _invalidate_exports(processed_dir, session_id)
+
+    response_summary = _response_summary(analysis_results)
+    summary = {
+        'total_frames': response_summary['total_frames'],
+        'successful_frames': response_summary['successful_frames'],
+        'key_frames_count': response_summary['key_frames_count']
+    }
+    write_session_status(processed_dir, session_id, {
+        'has_trajectory_data': True,
+        'has_dmabn_analysis': True,
+        'ready_for_analysis': True,
+        'analysis_running': False,
+        'analysis_error': None,
+        'analysis_summary': summary
+    })
+    return summary
+
 @dmabn_bp.route('/analyze', methods=['POST'])
 def analyze_geometry():
     """
@@ -30,68 +298,68 @@ def analyze_geometry():
         # Load existing trajectory data (JSON format)
         processed_dir = current_app.config.get('PROCESSED_FOLDER', 'data/processed')
         session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
-        print(f"DEBUG: Looking for file: {session_file}")
-        
-        if not os.path.exists(session_file):
+        logger.debug("Looking for file: %s", session_file)
+
+        try:
+            meta = _load_session_or_none(_meta_file(processed_dir, session_id))
+            if meta is None:
+                # Legacy sessions kept settings inside the big processed
+                # cache; lift out just the keys the meta file owns
+                legacy = _load_session(session_file)
+                meta = {key: legacy[key]
+                        for key in ('fragment_mapping', 'dmabn_calculation_method')
+                        if key in legacy}
+
+            preferred_method = meta.get('dmabn_calculation_method', 'default')
+
+            # Re-running analysis on unchanged inputs (double-clicked
+            # button, page reload) would redo the dominant cost of this
+            # endpoint, so short-circuit when the stored analysis matches
+            analysis_key = _analysis_key(processed_dir, session_id,
+                                            preferred_method, meta.get('fragment_mapping'))
+        except FileNotFoundError:
             return jsonify({
                 'success': False,
                 'error': 'No processed data found for this session.'
             }), 404
-        
-        # Load trajectory data
-        with open(session_file, 'r') as f:
-            cached_data = json.load(f)
-        
-        trajectory_data = cached_data.get('trajectory', [])
-        print(f"DEBUG: Found {len(trajectory_data)} trajectory frames")
 
-        analyzer = DMABNGeometryAnalyzer()
-        
-        if not trajectory_data:
+        if meta.get('dmabn_analysis_key') == analysis_key:
+            analysis_results = _load_session_or_none(
+                _analysis_file(processed_dir, session_id))
+            if analysis_results is not None:
+                logger.debug("Reusing cached analysis for key %s", analysis_key)
+                return _analysis_response(session_id, analysis_results, cached=True)
+
+        # A job for this session may already be in flight (double-click,
+        # page reload); report it instead of queuing a duplicate
+        existing = _JOBS.get(session_id)
+        if existing is not None and not existing.done():
             return jsonify({
-                'success': False,
-                'error': 'No trajectory data found in session.'
-            }), 400
+                'success': True,
+                'session_id': session_id,
+                'status': 'running'
+            }), 202
+
+        # Run the analysis in a worker process and let the client poll
+        # /status/<session_id>; the request thread returns immediately
+        logger.debug("Submitting analysis job for session %s", session_id)
+        _JOBS[session_id] = _get_executor().submit(
+            _run_analysis, processed_dir, session_id,
+            preferred_method, meta.get('fragment_mapping'), analysis_key)
+
+        write_session_status(processed_dir, session_id, {
+            'analysis_running': True,
+            'analysis_error': None
+        })
 
-        # Check if user has selected a specific calculation method
-        preferred_method = cached_data.get('dmabn_calculation_method', 'default')
-        if preferred_method == 'dihedral':
-            analyzer.switch_to_dihedral_method()
-            print("DEBUG: Using dihedral method for twist calculation")
-        elif preferred_method == 'plane':
-            analyzer.switch_to_plane_method()
-            print("DEBUG: Using plane-to-plane method for twist calculation")
-        else:
-            print("DEBUG: Using default twist calculation method")
-        
-        # Perform analysis on all frames
-        print(f"DEBUG: Starting analysis on all {len(trajectory_data)} frames")
-        analysis_results = analyzer.analyze_trajectory(trajectory_data)
-        print(f"DEBUG: Analysis complete, got {len(analysis_results['geometry_data'])} results")
-        
-        # Save analysis results to cache
-        cached_data['dmabn_analysis'] = analysis_results
-        with open(session_file, 'w') as f:
-            json.dump(cached_data, f, default=str)
-        print("DEBUG: Saved analysis results to cache")
-        
-        # Return real analysis results
         return jsonify({
             'success': True,
             'session_id': session_id,
-            'analysis_summary': {
-                'total_frames': analysis_results['metadata']['total_frames'],
-                'successful_frames': analysis_results['metadata']['successful_frames'],
-                'key_frames_count': len(analysis_results['metadata']['key_frames']),
-                'parameters_analyzed': ['twist_angle', 'ring_planarity', 'ring_nitrile_angle', 
-                                        'donor_acceptor_distance', 'amino_pyramidalization']
-            },
-            'fragment_mapping': analysis_results['fragment_mapping'],
-            'key_frames': analysis_results['metadata']['key_frames'][:5]  # Top 5 key frames
-        })
-        
+            'status': 'running'
+        }), 202
+
     except Exception as e:
-        print(f"DEBUG: Error in analyze_geometry: {e}")
+        logger.error("Error in analyze_geometry: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': f'Analysis failed: {str(e)}'
@@ -104,34 +372,38 @@ def get_geometry_data(session_id):
     """
     try:
         processed_dir = current_app.config.get('PROCESSED_FOLDER', 'data/processed')
-        session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
-        
-        if not os.path.exists(session_file):
-            return jsonify({
-                'success': False,
-                'error': 'Session data not found'
-            }), 404
-        
-        # Load cached data
-        with open(session_file, 'r') as f:
-            cached_data = json.load(f)
-        
-        dmabn_analysis = cached_data.get('dmabn_analysis')
+
+        dmabn_analysis = _load_analysis(processed_dir, session_id)
         if not dmabn_analysis:
             return jsonify({
                 'success': False,
                 'error': 'No DMABN analysis found. Please run analysis first.'
             }), 404
         
-        return jsonify({
+        payload = {
             'success': True,
             'geometry_data': dmabn_analysis['geometry_data'],
             'fragment_mapping': dmabn_analysis['fragment_mapping'],
             'metadata': dmabn_analysis['metadata']
-        })
+        }
+
+        # Geometry data is thousands of float rows: encode with orjson and
+        # gzip the body (browsers decode Content-Encoding transparently).
+        # ?format=json or a client without gzip support gets plain JSON.
+        accepts_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        if request.args.get('format') == 'json' or not accepts_gzip:
+            return jsonify(payload)
+
+        body = gzip.compress(
+            orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY),
+            compresslevel=1)
+        return current_app.response_class(
+            body,
+            mimetype='application/json',
+            headers={'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'})
         
     except Exception as e:
-        print(f"Error retrieving DMABN data: {e}")
+        logger.error("Error retrieving DMABN data: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': f'Failed to retrieve data: {str(e)}'
@@ -153,50 +425,50 @@ def export_analysis(session_id, format):
                 'error': 'Unsupported export format. Use json or csv.'
             }), 400
         
-        processed_dir = current_app.config.get('PROCESSED_DATA_DIR', 'data/processed')
-        session_file = os.path.join(processed_dir, f"{session_id}.pkl")
-        
-        if not os.path.exists(session_file):
-            return jsonify({
-                'success': False,
-                'error': 'Session data not found'
-            }), 404
-        
-        # Load cached data
-        with open(session_file, 'rb') as f:
-            cached_data = pickle.load(f)
-        
-        dmabn_analysis = cached_data.get('dmabn_analysis')
+        processed_dir = current_app.config.get('PROCESSED_FOLDER', 'data/processed')
+
+        dmabn_analysis = _load_analysis(processed_dir, session_id)
         if not dmabn_analysis:
             return jsonify({
                 'success': False,
                 'error': 'No DMABN analysis found.'
             }), 404
         
-        # Create analyzer instance and load data
-        analyzer = DMABNGeometryAnalyzer()
-        analyzer.geometry_data = dmabn_analysis['geometry_data']
-        analyzer.fragment_mapping = dmabn_analysis['fragment_mapping']
-        analyzer.analysis_metadata = dmabn_analysis['metadata']
-        
-        # Export data
-        exported_data = analyzer.export_analysis(format)
-        
-        # Set appropriate response headers
-        if format == 'json':
-            response = current_app.response_class(
-                exported_data,
-                mimetype='application/json'
-            )
-            response.headers['Content-Disposition'] = f'attachment; filename=dmabn_analysis_{session_id}.json'
-        else:  # csv
-            response = current_app.response_class(
-                exported_data,
-                mimetype='text/csv'
-            )
-            response.headers['Content-Disposition'] = f'attachment; filename=dmabn_analysis_{session_id}.csv'
-        
-        return response
+        # Build the export artifact once; repeat downloads are served
+        # straight from disk with conditional-request support
+        export_file = _export_file(processed_dir, session_id, format)
+        if not os.path.exists(export_file):
+            analyzer = DMABNGeometryAnalyzer()
+            analyzer.geometry_data = dmabn_analysis['geometry_data']
+            analyzer.fragment_mapping = dmabn_analysis['fragment_mapping']
+            analyzer.analysis_metadata = dmabn_analysis['metadata']
+
+            # Stream chunks to a request-private temp file and publish
+            # with an atomic rename (same pattern as stream_save and
+            # persist_viewer_payload): concurrent downloads never see a
+            # half-written artifact, and a failure mid-stream leaves
+            # nothing behind to be served later
+            tmp = f"{export_file}.{uuid.uuid4().hex}.part"
+            try:
+                with open(tmp, 'w') as f:
+                    for chunk in analyzer.iter_export(format):
+                        f.write(chunk)
+                os.replace(tmp, export_file)
+            except Exception:
+                try:
+                    os.remove(tmp)
+                except FileNotFoundError:
+                    pass
+                raise
+
+        mimetype = 'application/json' if format == 'json' else 'text/csv'
+        return send_file(
+            export_file,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=f'dmabn_analysis_{session_id}.{format}',
+            conditional=True
+        )
         
     except Exception as e:
         logger.error(f"Error exporting DMABN analysis: {e}", exc_info=True)
@@ -222,38 +494,33 @@ def set_fragment_mapping(session_id):
         fragment_mapping = request_data['fragment_mapping']
         
         # Validate fragment mapping structure
-        required_fragments = [
-            'benzene_ring', 'amino_nitrogen', 'amino_carbons',
-            'nitrile_carbon', 'nitrile_nitrogen'
-        ]
-        
-        for fragment in required_fragments:
-            if fragment not in fragment_mapping:
-                return jsonify({
-                    'success': False,
-                    'error': f'Missing required fragment: {fragment}'
-                }), 400
+        missing = REQUIRED_FRAGMENTS.difference(fragment_mapping)
+        if missing:
+            return jsonify({
+                'success': False,
+                'error': f"Missing required fragments: {', '.join(sorted(missing))}"
+            }), 400
         
         # Load session data
-        processed_dir = current_app.config.get('PROCESSED_DATA_DIR', 'data/processed')
-        session_file = os.path.join(processed_dir, f"{session_id}.pkl")
-        
-        if not os.path.exists(session_file):
+        processed_dir = current_app.config.get('PROCESSED_FOLDER', 'data/processed')
+        session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
+
+        try:
+            os.stat(session_file)
+        except FileNotFoundError:
             return jsonify({
                 'success': False,
                 'error': 'Session data not found'
             }), 404
-        
-        # Update fragment mapping in cached data
-        with open(session_file, 'rb') as f:
-            cached_data = pickle.load(f)
-        
-        # Store fragment mapping for future analysis
-        cached_data['fragment_mapping'] = fragment_mapping
-        
-        with open(session_file, 'wb') as f:
-            pickle.dump(cached_data, f)
-        
+
+        # Store fragment mapping in the small meta file for future analysis
+        meta_file = _meta_file(processed_dir, session_id)
+        meta = _load_session_or_none(meta_file) or {}
+        meta['fragment_mapping'] = fragment_mapping
+        _save_session(meta_file, meta)
+        _invalidate_exports(processed_dir, session_id)
+        write_session_status(processed_dir, session_id, {'has_custom_fragments': True})
+
         logger.info(f"Fragment mapping updated for session {session_id}")
         return jsonify({
             'success': True,
@@ -273,37 +540,73 @@ def get_analysis_status(session_id):
     Get status of DMABN analysis for a session.
     """
     try:
-        processed_dir = current_app.config.get('PROCESSED_DATA_DIR', 'data/processed')
-        session_file = os.path.join(processed_dir, f"{session_id}.pkl")
-        
-        if not os.path.exists(session_file):
+        processed_dir = current_app.config.get('PROCESSED_FOLDER', 'data/processed')
+        status_file = os.path.join(processed_dir, f"{session_id}_status.json")
+        session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
+
+        # Settle any finished background analysis job: success already
+        # wrote its results from the worker, failures are recorded here
+        job = _JOBS.get(session_id)
+        if job is not None and job.done():
+            _JOBS.pop(session_id, None)
+            error = job.exception()
+            if error is not None:
+                logger.error("Background analysis failed for session %s: %s",
+                                session_id, error)
+                write_session_status(processed_dir, session_id, {
+                    'analysis_running': False,
+                    'analysis_error': str(error)
+                })
+
+        status = _load_session_or_none(status_file)
+        if status is not None:
+            # Fast path: status is a few hundred bytes, written on every
+            # mutation, so polling never touches the trajectory cache
+            status = dict(status)
+            status['session_id'] = session_id
+            status.setdefault('has_trajectory_data', False)
+            status.setdefault('has_dmabn_analysis', False)
+            status.setdefault('has_custom_fragments', False)
+            status.setdefault('ready_for_analysis', status['has_trajectory_data'])
+            return jsonify({
+                'success': True,
+                'status': status
+            })
+
+        # Legacy sessions: derive the status once and persist it
+        cached_data = _load_session_or_none(session_file)
+        if cached_data is None:
             return jsonify({
                 'success': False,
                 'error': 'Session not found'
             }), 404
-        
-        with open(session_file, 'rb') as f:
-            cached_data = pickle.load(f)
-        
-        has_trajectory = 'trajectory' in cached_data and len(cached_data['trajectory']) > 0
-        has_analysis = 'dmabn_analysis' in cached_data
-        has_fragment_mapping = 'fragment_mapping' in cached_data
-        
+
+        analysis_data = _load_analysis(processed_dir, session_id)
+
+        meta_file = _meta_file(processed_dir, session_id)
+        meta = _load_session_or_none(meta_file) or {}
+
+        has_trajectory = len(cached_data.get('trajectory') or []) > 0
+        has_fragment_mapping = ('fragment_mapping' in meta
+                                or 'fragment_mapping' in cached_data)
+
         status = {
             'session_id': session_id,
             'has_trajectory_data': has_trajectory,
-            'has_dmabn_analysis': has_analysis,
+            'has_dmabn_analysis': analysis_data is not None,
             'has_custom_fragments': has_fragment_mapping,
             'ready_for_analysis': has_trajectory
         }
-        
-        if has_analysis:
-            analysis_data = cached_data['dmabn_analysis']
+
+        if analysis_data:
             status['analysis_summary'] = {
                 'total_frames': analysis_data['metadata']['total_frames'],
                 'successful_frames': analysis_data['metadata']['successful_frames'],
                 'key_frames_count': len(analysis_data['metadata']['key_frames'])
             }
+
+        write_session_status(processed_dir, session_id,
+                            {k: v for k, v in status.items() if k != 'session_id'})
         
         return jsonify({
             'success': True,
@@ -324,20 +627,16 @@ def debug_twist_calculation(session_id):
     """
     try:
         processed_dir = current_app.config.get('PROCESSED_FOLDER', 'data/processed')
-        session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
-        
-        if not os.path.exists(session_file):
+
+        # Load trajectory data (binary npz store when available)
+        try:
+            trajectory_data = _load_trajectory(processed_dir, session_id)
+        except FileNotFoundError:
             return jsonify({
                 'success': False,
                 'error': 'Session data not found'
             }), 404
-        
-        # Load trajectory data
-        with open(session_file, 'r') as f:
-            cached_data = json.load(f)
-        
-        trajectory_data = cached_data.get('trajectory', [])
-        
+
         if not trajectory_data:
             return jsonify({
                 'success': False,
@@ -381,24 +680,22 @@ def switch_calculation_method():
         
         processed_dir = current_app.config.get('PROCESSED_FOLDER', 'data/processed')
         session_file = os.path.join(processed_dir, f"{session_id}_processed.json")
-        
-        if not os.path.exists(session_file):
+
+        try:
+            os.stat(session_file)
+        except FileNotFoundError:
             return jsonify({
                 'success': False,
                 'error': 'Session data not found'
             }), 404
-        
-        # Load cached data
-        with open(session_file, 'r') as f:
-            cached_data = json.load(f)
-        
-        # Store the method preference
-        cached_data['dmabn_calculation_method'] = method
-        
-        # Save back to cache
-        with open(session_file, 'w') as f:
-            json.dump(cached_data, f, default=str)
-        
+
+        # Store the method preference in the small meta file so the
+        # trajectory cache is not rewritten for a one-key change
+        meta_file = _meta_file(processed_dir, session_id)
+        meta = _load_session_or_none(meta_file) or {}
+        meta['dmabn_calculation_method'] = method
+        _save_session(meta_file, meta)
+
         logger.info(f"Switched DMABN calculation method to {method} for session {session_id}")
         
         return jsonify({
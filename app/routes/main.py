@@ -1,14 +1,39 @@
 # app/routes/main.py - Main application routes
 
 from flask import Blueprint, render_template, session, redirect, url_for, request, jsonify
+import logging
 import os
 import uuid
-import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 main_bp = Blueprint('main', __name__)
 
+def _fast_copy(src, dst):
+    """Copy a file with os.sendfile (kernel-space, no userspace buffer)"""
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        os.sendfile(d.fileno(), s.fileno(), 0, os.fstat(s.fileno()).st_size)
+
+def _link_or_copy(src, dst):
+    """
+    Materialize src at dst without duplicating data when possible
+
+    Example files are read-only, so a hardlink (same filesystem) or
+    symlink makes the per-session "copy" an inode operation and keeps a
+    single physical copy on disk. Falls back to sendfile copy if the
+    filesystem refuses links.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        try:
+            os.symlink(os.path.abspath(src), dst)
+        except OSError:
+            _fast_copy(src, dst)
+
 @main_bp.route('/')
 def index():
     """Main upload page"""
@@ -36,9 +61,11 @@ def viewer():
         # Redirect to upload page if no session
         return redirect(url_for('main.index'))
     
-    # Validate session exists
+    # Validate session exists (EAFP: one stat, no exists() pre-check)
     cache_file = os.path.join('data', 'processed', f'{session_id}.json')
-    if not os.path.exists(cache_file):
+    try:
+        os.stat(cache_file)
+    except FileNotFoundError:
         # Session data not found, redirect to upload
         return redirect(url_for('main.index'))
     
@@ -50,11 +77,11 @@ def load_example_data(example_type):
     try:
         if example_type == 'DMABNvacuum':
             # Generate session ID
-            session_id = str(uuid.uuid4())
+            session_id = uuid.uuid4().hex
             session['upload_session_id'] = session_id
             session['molecule_type'] = 'dmabn'
             
-            print(f"Sample Data: Automatically set molecule_type to 'dmabn' for session {session_id}")
+            logger.debug("Sample Data: Automatically set molecule_type to 'dmabn' for session %s", session_id)
             
             # Create session directory
             upload_dir = os.path.join('data/uploads', session_id)
@@ -65,13 +92,21 @@ def load_example_data(example_type):
             sample_files = ['coors.xyz', 's1.dat', 's2.dat']
             copied_files = []
             
-            for filename in sample_files:
-                source_path = os.path.join(sample_files_dir, filename)
-                if os.path.exists(source_path):
-                    dest_path = os.path.join(upload_dir, filename)
-                    shutil.copy2(source_path, dest_path)
-                    copied_files.append(filename)
-                    print(f"Copied sample file: {filename}")
+            existing_files = [f for f in sample_files
+                                if os.path.exists(os.path.join(sample_files_dir, f))]
+
+            # Linking is O(1) per file, so the pool only matters for the
+            # rare sendfile fallback
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                list(executor.map(
+                    lambda fn: _link_or_copy(os.path.join(sample_files_dir, fn),
+                                                os.path.join(upload_dir, fn)),
+                    existing_files
+                ))
+
+            for filename in existing_files:
+                copied_files.append(filename)
+                logger.debug("Linked sample file: %s", filename)
             
             # Process the copied files to create the cached JSON data
             try:
@@ -88,11 +123,11 @@ def load_example_data(example_type):
                         'error': f'Failed to process sample data: {processing_result.get("error")}'
                     }), 500
                     
-                print(f"Sample data processed successfully for session {session_id}")
+                logger.debug("Sample data processed successfully for session %s", session_id)
                 
             except ImportError:
                 # Fallback: create minimal processed data manually
-                print("Warning: molecular_data_processor not found, creating minimal cache")
+                logger.warning("molecular_data_processor not found, creating minimal cache")
                 
                 processed_dir = 'data/processed'
                 os.makedirs(processed_dir, exist_ok=True)
@@ -114,10 +149,10 @@ def load_example_data(example_type):
                 with open(cache_file, 'w') as f:
                     json.dump(cache_data, f)
                 
-                print(f"Created minimal cache at {cache_file}")
+                logger.debug("Created minimal cache at %s", cache_file)
                 
             except Exception as proc_error:
-                print(f"Processing error: {proc_error}")
+                logger.error("Processing error: %s", proc_error, exc_info=True)
                 return jsonify({
                     'success': False,
                     'error': f'Sample data processing failed: {str(proc_error)}'
@@ -138,7 +173,7 @@ def load_example_data(example_type):
             }), 400
             
     except Exception as e:
-        print(f"Error loading example data: {e}")
+        logger.error("Error loading example data: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': f'Failed to load example data: {str(e)}'
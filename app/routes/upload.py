@@ -10,21 +10,63 @@ import json
 upload_bp = Blueprint('upload', __name__, url_prefix='/api')
 
 # Configuration
-ALLOWED_EXTENSIONS = {'xyz', 'dat', 'txt'}
+ALLOWED_EXTENSIONS = frozenset({'xyz', 'dat', 'txt'})
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
 UPLOAD_FOLDER = 'data/uploads'
+UPLOAD_CHUNK_SIZE = 256 * 1024
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
+    # rpartition avoids building the 2-element list rsplit would return
     return '.' in filename and \
-            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+            filename.rpartition('.')[2].lower() in ALLOWED_EXTENSIONS
 
-def validate_file_size(file):
-    """Validate file size"""
-    file.seek(0, os.SEEK_END)
-    size = file.tell()
-    file.seek(0)  # Reset to beginning
-    return size <= MAX_FILE_SIZE
+def stream_save(file_storage, dst, max_bytes=MAX_FILE_SIZE):
+    """
+    Stream an uploaded file to disk in fixed-size chunks.
+
+    The size limit is enforced with a running count while writing, so
+    the 100MB trajectories this app accepts are never buffered in memory
+    and no extra seek-to-end pass is needed before saving. Data goes
+    into an exclusively-created '.part' file and os.replace publishes it
+    atomically, so downstream readers never observe a half-written file.
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        ValueError: If the file exceeds max_bytes (partial file removed)
+    """
+    part = f"{dst}.part"
+    total = 0
+    fd = os.open(part, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with open(fd, 'wb', buffering=1 << 20) as out:
+            while chunk := file_storage.stream.read(UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise ValueError(f'File exceeds {max_bytes} byte limit')
+                out.write(chunk)
+    except Exception:
+        os.remove(part)
+        raise
+    os.replace(part, dst)
+    return total
+
+# Directories already created by this process; saves the makedirs
+# syscall chain on every upload after the first to a given session
+_created_dirs = set()
+
+def _ensure_dir(path):
+    """os.makedirs, skipped entirely once this process has made path"""
+    if path not in _created_dirs:
+        os.makedirs(path, exist_ok=True)
+        _created_dirs.add(path)
+
+@upload_bp.before_request
+def _raise_form_memory_limit():
+    """Keep small form fields in memory; large parts spool to temp files"""
+    request.max_form_memory_size = 1 << 20
 
 @upload_bp.route('/upload', methods=['POST'])
 def upload_files():
@@ -45,12 +87,12 @@ def upload_files():
             }), 400
         
         # Generate session ID
-        session_id = str(uuid.uuid4())
+        session_id = uuid.uuid4().hex
         session['upload_session_id'] = session_id
         
         # Create upload directory
         upload_dir = os.path.join(UPLOAD_FOLDER, session_id)
-        os.makedirs(upload_dir, exist_ok=True)
+        _ensure_dir(upload_dir)
         
         uploaded_files = []
         errors = []
@@ -73,18 +115,11 @@ def upload_files():
                 errors.append(f"File type not allowed: {filename}")
                 continue
             
-            if not validate_file_size(file):
-                errors.append(f"File too large: {filename}")
-                continue
-            
-            # Save file
+            # Save file (single streaming pass validates size as it writes)
             try:
                 file_path = os.path.join(upload_dir, filename)
-                file.save(file_path)
-                
-                # Get file info
-                file_size = os.path.getsize(file_path)
-                
+                file_size = stream_save(file, file_path, MAX_FILE_SIZE)
+
                 uploaded_files.append({
                     'filename': filename,
                     'size': file_size,
@@ -92,7 +127,9 @@ def upload_files():
                 })
                 
                 print(f"Uploaded: {filename} ({file_size} bytes)")
-                
+
+            except ValueError:
+                errors.append(f"File too large: {filename}")
             except Exception as e:
                 errors.append(f"Failed to save {filename}: {str(e)}")
                 print(f"Upload error for {filename}: {e}")
@@ -146,22 +183,24 @@ def upload_status(session_id):
                 'error': 'Session not found'
             }), 404
         
-        # List uploaded files
+        # List uploaded files (scandir's DirEntry carries cached stat
+        # info, so this is one stat per file instead of four)
         files = []
         total_size = 0
-        
-        for filename in os.listdir(upload_dir):
-            file_path = os.path.join(upload_dir, filename)
-            if os.path.isfile(file_path):
-                file_size = os.path.getsize(file_path)
+
+        with os.scandir(upload_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
                 files.append({
-                    'filename': filename,
-                    'size': file_size,
+                    'filename': entry.name,
+                    'size': stat.st_size,
                     'uploaded_at': datetime.fromtimestamp(
-                        os.path.getctime(file_path)
+                        stat.st_ctime
                     ).isoformat()
                 })
-                total_size += file_size
+                total_size += stat.st_size
         
         # Check file types
         filenames = [f['filename'] for f in files]
@@ -193,15 +232,19 @@ def clear_upload(session_id):
     """Clear uploaded files for a session"""
     try:
         upload_dir = os.path.join(UPLOAD_FOLDER, session_id)
-        
+
         if os.path.exists(upload_dir):
             import shutil
             shutil.rmtree(upload_dir)
-            
+
             # Also clear processed data
             processed_file = os.path.join('data', 'processed', f'{session_id}.json')
             if os.path.exists(processed_file):
                 os.remove(processed_file)
+
+            # Drop any memoized viewer data for this session
+            from app.utils.data_processor import invalidate
+            invalidate(session_id)
         
         # Clear session
         if 'upload_session_id' in session and session['upload_session_id'] == session_id:
@@ -229,30 +272,44 @@ def cleanup_old_uploads(max_age_hours=24):
     current_time = time.time()
     max_age_seconds = max_age_hours * 3600
     
-    cleaned_count = 0
-    
-    for session_dir in os.listdir(UPLOAD_FOLDER):
-        session_path = os.path.join(UPLOAD_FOLDER, session_dir)
-        
-        if os.path.isdir(session_path):
-            # Check directory age
-            dir_age = current_time - os.path.getctime(session_path)
-            
+    # Collect expired sessions first, then remove them in parallel:
+    # rmtree is one unlink syscall per file, so threads keep many
+    # unlinks in flight instead of waiting on each in turn
+    targets = []
+    with os.scandir(UPLOAD_FOLDER) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+
+            # Check directory age from the DirEntry's cached stat
+            dir_age = current_time - entry.stat().st_ctime
+
             if dir_age > max_age_seconds:
-                try:
-                    import shutil
-                    shutil.rmtree(session_path)
-                    
-                    # Also clean processed data
-                    processed_file = os.path.join('data', 'processed', f'{session_dir}.json')
-                    if os.path.exists(processed_file):
-                        os.remove(processed_file)
-                    
-                    cleaned_count += 1
-                    print(f"Cleaned old upload: {session_dir}")
-                    
-                except Exception as e:
-                    print(f"Failed to clean {session_dir}: {e}")
+                targets.append((entry.name, entry.path))
+
+    def remove_session(target):
+        session_name, session_path = target
+        try:
+            import shutil
+            shutil.rmtree(session_path)
+
+            # Also clean processed data
+            processed_file = os.path.join('data', 'processed', f'{session_name}.json')
+            if os.path.exists(processed_file):
+                os.remove(processed_file)
+
+            print(f"Cleaned old upload: {session_name}")
+            return True
+
+        except Exception as e:
+            print(f"Failed to clean {session_name}: {e}")
+            return False
+
+    cleaned_count = 0
+    if targets:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(32, len(targets))) as pool:
+            cleaned_count = sum(pool.map(remove_session, targets))
     
     if cleaned_count > 0:
         print(f"Cleanup complete: {cleaned_count} old uploads removed")
@@ -1514,11 +1514,20 @@ async function runDMABNAnalysis() {
         });
         
         const data = await response.json();
-        
+
         if (data.success) {
-            console.log('DMABN analysis completed:', data.analysis_summary);
-            alert(`Analysis complete! Analyzed ${data.analysis_summary.successful_frames} frames with ${data.analysis_summary.key_frames_count} key frames identified.`);
-            
+            let summary = data.analysis_summary;
+
+            // A 202 means the analysis runs in the background; poll the
+            // status endpoint until it settles
+            if (data.status === 'running') {
+                console.log('Analysis running in background - polling status...');
+                summary = await pollDMABNAnalysisStatus(data.session_id);
+            }
+
+            console.log('DMABN analysis completed:', summary);
+            alert(`Analysis complete! Analyzed ${summary.successful_frames} frames with ${summary.key_frames_count} key frames identified.`);
+
             // Enable geometry charts
             const geometryBtn = document.getElementById('geometry-timeline-btn');
             if (geometryBtn) {
@@ -1529,7 +1538,7 @@ async function runDMABNAnalysis() {
             console.error('Analysis failed:', data.error);
             alert('Analysis failed: ' + data.error);
         }
-        
+
     } catch (error) {
         console.error('DMABN analysis error:', error);
         alert('Analysis failed: ' + error.message);
@@ -1543,6 +1552,32 @@ async function runDMABNAnalysis() {
     }
 }
 
+// Poll /api/dmabn/status until the background analysis settles.
+// Resolves with the analysis summary, throws on analysis_error or timeout.
+async function pollDMABNAnalysisStatus(sessionId, intervalMs = 2000, maxAttempts = 300) {
+    for (let attempt = 0; attempt < maxAttempts; attempt++) {
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+
+        const response = await fetch(`/api/dmabn/status/${sessionId}`, {
+            credentials: 'same-origin'
+        });
+        const data = await response.json();
+
+        if (!data.success) {
+            throw new Error(data.error || 'Status check failed');
+        }
+
+        const status = data.status;
+        if (status.analysis_error) {
+            throw new Error(status.analysis_error);
+        }
+        if (!status.analysis_running && status.has_dmabn_analysis) {
+            return status.analysis_summary || {};
+        }
+    }
+    throw new Error('Analysis timed out - check the status endpoint or retry');
+}
+
 async function showGeometryTimeline() {
     console.log('showGeometryTimeline called - loading geometry data...');
     
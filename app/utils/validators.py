@@ -1,17 +1,41 @@
 # Input validation utilities
 
+import io
 import os
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from typing import Dict, List, Tuple, Optional
 
+import numpy as np
+
+from app.utils.file_parser import TrajectoryArrays
+
+# Compiled once at import; validate_filename runs per uploaded file
+_NAME_RE = re.compile(r'^[a-zA-Z0-9._\-]+\Z')
+
+def _norm(name: str) -> str:
+    """
+    Canonical lowercase form of a filename, interned.
+
+    The same handful of names (coors.xyz, s1.dat, ...) recur on every
+    upload; interning lets set membership short-circuit on pointer
+    equality and avoids keeping duplicate lowered copies alive.
+    """
+    return sys.intern(name.lower())
+
 class FileValidator:
     """Validate uploaded molecular data files"""
     
     def __init__(self):
-        self.allowed_extensions = {'.xyz', '.dat', '.txt'}
+        self.allowed_extensions = frozenset({'.xyz', '.dat', '.txt'})
         self.max_file_size = 100 * 1024 * 1024  # 100MB
-        self.required_files = {'coors.xyz'}  # Required files
-        self.optional_files = {'s1.dat', 's2.dat', 'fail.dat'}  # Optional files
+        self.required_files = frozenset(map(_norm, {'coors.xyz'}))  # Required files
+        self.optional_files = frozenset(map(_norm, {'s1.dat', 's2.dat', 'fail.dat'}))  # Optional files
+        # Union built once here; validate_filename and validate_upload_set
+        # used to rebuild it on every call
+        self._known_files = self.required_files | self.optional_files
     
     def validate_filename(self, filename: str) -> Dict[str, bool]:
         """Validate filename format and extension"""
@@ -24,17 +48,21 @@ class FileValidator:
         if not filename:
             return validation
         
-        # Check for valid filename (no dangerous characters)
-        if re.match(r'^[a-zA-Z0-9._-]+$', filename):
+        # Check for valid filename (no dangerous characters); \Z instead
+        # of $ so a trailing newline can't slip through
+        if _NAME_RE.match(filename):
             validation['valid_name'] = True
         
+        # Lowercase once and intern; both checks below reuse it
+        name = _norm(filename)
+
         # Check extension
-        _, ext = os.path.splitext(filename.lower())
+        _, ext = os.path.splitext(name)
         if ext in self.allowed_extensions:
             validation['valid_extension'] = True
         
         # Check if recognized file
-        if filename.lower() in (self.required_files | self.optional_files):
+        if name in self._known_files:
             validation['recognized'] = True
         
         return validation
@@ -53,67 +81,73 @@ class FileValidator:
         }
         
         try:
+            # Stream instead of readlines(): only the first 10 frames are
+            # checked, so for a multi-GB trajectory this reads a few KB
+            # rather than the whole file
             with open(file_path, 'r') as f:
-                lines = f.readlines()
-            
-            i = 0
-            frame_count = 0
-            atoms_per_frame = None
-            
-            while i < len(lines):
-                try:
-                    # Read number of atoms
-                    n_atoms = int(lines[i].strip())
-                    
-                    # Consistency check
-                    if atoms_per_frame is None:
-                        atoms_per_frame = n_atoms
-                        validation['n_atoms'] = n_atoms
-                    elif atoms_per_frame != n_atoms:
-                        validation['errors'].append(f"Inconsistent atom count in frame {frame_count}")
-                    
-                    # Skip comment line
-                    if i + 1 >= len(lines):
-                        validation['errors'].append(f"Missing comment line in frame {frame_count}")
+                it = iter(f)
+                frame_count = 0
+                atoms_per_frame = None
+
+                while frame_count < 10:
+                    header = next(it, None)
+                    if header is None:
                         break
-                    
-                    # Validate coordinate lines
-                    for j in range(i + 2, i + 2 + n_atoms):
-                        if j >= len(lines):
-                            validation['errors'].append(f"Missing coordinate line in frame {frame_count}")
-                            break
-                        
-                        parts = lines[j].split()
-                        if len(parts) < 4:
-                            validation['errors'].append(f"Invalid coordinate format in frame {frame_count}")
-                            break
-                        
-                        # Try to parse coordinates
-                        try:
-                            float(parts[1])
-                            float(parts[2])
-                            float(parts[3])
-                        except ValueError:
-                            validation['errors'].append(f"Non-numeric coordinates in frame {frame_count}")
+
+                    try:
+                        # Read number of atoms
+                        n_atoms = int(header.strip())
+
+                        # Consistency check
+                        if atoms_per_frame is None:
+                            atoms_per_frame = n_atoms
+                            validation['n_atoms'] = n_atoms
+                        elif atoms_per_frame != n_atoms:
+                            validation['errors'].append(f"Inconsistent atom count in frame {frame_count}")
+
+                        # Skip comment line
+                        if next(it, None) is None:
+                            validation['errors'].append(f"Missing comment line in frame {frame_count}")
                             break
-                    
-                    frame_count += 1
-                    i += n_atoms + 2
-                    
-                    # Limit validation to first few frames for large files
-                    if frame_count >= 10:
+
+                        # Validate coordinate lines: one C-level parse of the
+                        # whole frame block replaces three float() dispatches
+                        # per atom in the interpreter
+                        coord_block = list(islice(it, n_atoms))
+                        if len(coord_block) < n_atoms:
+                            validation['errors'].append(f"Missing coordinate line in frame {frame_count}")
+                        else:
+                            try:
+                                np.loadtxt(io.StringIO(''.join(coord_block)),
+                                            usecols=(1, 2, 3), ndmin=2)
+                            except (ValueError, IndexError):
+                                # Slow path only on failure, to keep the
+                                # precise per-line error message
+                                for line in coord_block:
+                                    parts = line.split()
+                                    if len(parts) < 4:
+                                        validation['errors'].append(f"Invalid coordinate format in frame {frame_count}")
+                                        break
+                                    try:
+                                        float(parts[1])
+                                        float(parts[2])
+                                        float(parts[3])
+                                    except ValueError:
+                                        validation['errors'].append(f"Non-numeric coordinates in frame {frame_count}")
+                                        break
+
+                        frame_count += 1
+
+                    except (ValueError, IndexError) as e:
+                        validation['errors'].append(f"Parse error in frame {frame_count}: {e}")
                         break
-                        
-                except (ValueError, IndexError) as e:
-                    validation['errors'].append(f"Parse error in frame {frame_count}: {e}")
-                    break
-            
+
             validation['n_frames'] = frame_count
             validation['valid_structure'] = len(validation['errors']) == 0
-            
+
         except Exception as e:
             validation['errors'].append(f"File read error: {e}")
-        
+
         return validation
     
     def validate_dat_content(self, file_path: str) -> Dict[str, any]:
@@ -126,12 +160,9 @@ class FileValidator:
         }
         
         try:
-            import numpy as np
-            data = np.loadtxt(file_path)
-            
-            if data.ndim == 1:
-                data = data.reshape(1, -1)
-            
+            # ndmin=2 keeps single-row files 2D without a reshape pass
+            data = np.loadtxt(file_path, ndmin=2)
+
             validation['n_rows'] = data.shape[0]
             validation['n_cols'] = data.shape[1]
             
@@ -141,17 +172,28 @@ class FileValidator:
             else:
                 validation['errors'].append("Expected at least 2 columns (energy, oscillator strength)")
             
-            # Check for reasonable values
-            if np.any(np.isnan(data)) or np.any(np.isinf(data)):
+            # Value checks as two fused reductions instead of re-streaming
+            # the array once per condition: one isfinite pass, then one
+            # min over both checked columns
+            if np.isfinite(data).all():
+                e_min, o_min = np.min(data[:, :2], axis=0)
+
+                # Check energy values (should be positive)
+                if e_min <= 0:
+                    validation['errors'].append("Energy values should be positive")
+
+                # Check oscillator strengths (should be non-negative)
+                if o_min < 0:
+                    validation['errors'].append("Oscillator strengths should be non-negative")
+            else:
                 validation['errors'].append("Contains NaN or infinite values")
-            
-            # Check energy values (should be positive)
-            if np.any(data[:, 0] <= 0):
-                validation['errors'].append("Energy values should be positive")
-            
-            # Check oscillator strengths (should be non-negative)
-            if np.any(data[:, 1] < 0):
-                validation['errors'].append("Oscillator strengths should be non-negative")
+
+                # NaNs poison min(), so the rare bad file keeps the
+                # elementwise comparisons
+                if np.any(data[:, 0] <= 0):
+                    validation['errors'].append("Energy values should be positive")
+                if np.any(data[:, 1] < 0):
+                    validation['errors'].append("Oscillator strengths should be non-negative")
             
         except Exception as e:
             validation['errors'].append(f"Data parsing error: {e}")
@@ -168,7 +210,7 @@ class FileValidator:
             'errors': []
         }
         
-        uploaded_set = set(f.lower() for f in uploaded_files)
+        uploaded_set = set(map(_norm, uploaded_files))
         
         # Check required files
         missing_required = self.required_files - uploaded_set
@@ -178,7 +220,7 @@ class FileValidator:
             validation['errors'].extend([f"Missing required file: {f}" for f in missing_required])
         
         # Check file status
-        for file_type in (self.required_files | self.optional_files):
+        for file_type in self._known_files:
             validation['file_status'][file_type] = file_type in uploaded_set
         
         # Check for complete excitation data set
@@ -191,18 +233,56 @@ class FileValidator:
             validation['warnings'].append("Only one excitation file uploaded (need both s1.dat and s2.dat)")
         
         # Check for unknown files
-        known_files = self.required_files | self.optional_files
-        unknown_files = uploaded_set - known_files
+        unknown_files = uploaded_set - self._known_files
         if unknown_files:
             validation['warnings'].extend([f"Unknown file type: {f}" for f in unknown_files])
         
         return validation
 
+    def validate_all(self, file_paths: List[str]) -> Dict[str, any]:
+        """
+        Validate a batch of uploaded files concurrently.
+
+        Content validation is I/O- and NumPy-bound, both of which
+        release the GIL, so a small thread pool overlaps the per-file
+        work instead of running the files back to back.
+
+        Args:
+            file_paths: Paths to the uploaded files
+
+        Returns:
+            {'files': {basename: per-file validation}, 'upload_set':
+            whole-set validation}
+        """
+        results = {'files': {}, 'upload_set': None}
+        if not file_paths:
+            results['upload_set'] = self.validate_upload_set([])
+            return results
+
+        def validate_one(path):
+            name = os.path.basename(path)
+            result = {'filename': self.validate_filename(name)}
+            ext = '.' + name.rpartition('.')[2].lower() if '.' in name else ''
+            if ext == '.xyz':
+                result['content'] = self.validate_xyz_content(path)
+            elif ext in ('.dat', '.txt'):
+                result['content'] = self.validate_dat_content(path)
+            return name, result
+
+        with ThreadPoolExecutor(max_workers=min(4, len(file_paths))) as pool:
+            for future in as_completed([pool.submit(validate_one, p)
+                                        for p in file_paths]):
+                name, result = future.result()
+                results['files'][name] = result
+
+        results['upload_set'] = self.validate_upload_set(list(results['files']))
+        return results
+
 class DataValidator:
     """Validate processed molecular data"""
     
-    def validate_trajectory_data(self, trajectory_data: List[Dict]) -> Dict[str, any]:
-        """Validate trajectory data structure"""
+    def validate_trajectory_data(self, trajectory_data) -> Dict[str, any]:
+        """Validate trajectory data structure (frame dicts or SoA arrays)"""
         validation = {
             'valid': False,
             'n_frames': 0,
@@ -210,31 +290,53 @@ class DataValidator:
             'consistent_structure': True,
             'errors': []
         }
-        
+
+        # SoA trajectories are consistent by construction: the shape of
+        # the one coordinate block answers every structural question
+        if isinstance(trajectory_data, TrajectoryArrays):
+            n_frames, n_atoms = trajectory_data.coords.shape[:2]
+            validation['n_frames'] = n_frames
+            validation['n_atoms'] = n_atoms
+            if n_frames == 0:
+                validation['errors'].append("Empty trajectory data")
+            elif len(trajectory_data.atoms) != n_atoms:
+                validation['errors'].append("Atom list does not match coordinate block")
+                validation['consistent_structure'] = False
+            validation['valid'] = len(validation['errors']) == 0
+            return validation
+
         if not trajectory_data:
             validation['errors'].append("Empty trajectory data")
             return validation
         
         validation['n_frames'] = len(trajectory_data)
-        
-        # Check first frame structure
+
+        # Check first frame structure; frames may be dicts (legacy loop
+        # parser output) or Frame records, so probe with hasattr/getattr
         first_frame = trajectory_data[0]
-        required_keys = ['atoms', 'coords', 'frame_number', 'time_fs']
-        
+        if isinstance(first_frame, dict):
+            required_keys = ['atoms', 'coords', 'frame_number', 'time_fs']
+            has = first_frame.__contains__
+            get = lambda frame, key: frame.get(key, [])
+        else:
+            required_keys = ['atoms', 'coords', 'frame_number', 'comment']
+            has = lambda key: hasattr(first_frame, key)
+            get = lambda frame, key: getattr(frame, key, [])
+
         for key in required_keys:
-            if key not in first_frame:
+            if not has(key):
                 validation['errors'].append(f"Missing key in trajectory data: {key}")
-        
-        if 'atoms' in first_frame and 'coords' in first_frame:
-            validation['n_atoms'] = len(first_frame['atoms'])
-            
+
+        if has('atoms') and has('coords'):
+            validation['n_atoms'] = len(get(first_frame, 'atoms'))
+
             # Check consistency across frames
             for i, frame in enumerate(trajectory_data[:10]):  # Check first 10 frames
-                if len(frame.get('atoms', [])) != validation['n_atoms']:
+                if len(get(frame, 'atoms')) != validation['n_atoms']:
                     validation['errors'].append(f"Inconsistent atom count in frame {i}")
                     validation['consistent_structure'] = False
-                
-                if len(frame.get('coords', [])) != validation['n_atoms']:
+
+                if len(get(frame, 'coords')) != validation['n_atoms']:
                     validation['errors'].append(f"Inconsistent coordinate count in frame {i}")
                     validation['consistent_structure'] = False
         
@@ -264,11 +366,16 @@ class DataValidator:
             if key not in first_point:
                 validation['errors'].append(f"Missing key in excitation data: {key}")
         
-        # Check time ordering
-        times = [point.get('time_fs', 0) for point in excitation_data]
-        if times != sorted(times):
-            validation['errors'].append("Excitation data not time-ordered")
-            validation['time_ordered'] = False
+        # Check time ordering with one early-exit scan; sorting a second
+        # copy just to compare is O(N log N) and 2N floats of memory
+        prev = float('-inf')
+        for point in excitation_data:
+            t = point.get('time_fs', 0)
+            if t < prev:
+                validation['errors'].append("Excitation data not time-ordered")
+                validation['time_ordered'] = False
+                break
+            prev = t
         
         # Check for reasonable values
         for i, point in enumerate(excitation_data[:10]):  # Check first 10 points
@@ -4,22 +4,34 @@ Configuration settings for DMABN MD Viewer
 """
 
 import os
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Snapshot the environment once: Config and its subclasses do ~10
+# os.environ lookups at import time, each hashing through the live
+# (case-normalizing on some platforms) environ mapping
+_env = os.environ.copy()
+_cwd = os.getcwd()
+
+def _rgb_table(order, colors):
+    """Parse '#rrggbb' strings into a (n_elements, 3) uint8 array"""
+    return np.array([[int(colors[sym][i:i + 2], 16) for i in (1, 3, 5)]
+                        for sym in order], dtype=np.uint8)
+
 class Config:
     """Base configuration class"""
     
     # Flask settings
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
-    DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
+    SECRET_KEY = _env.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
+    DEBUG = _env.get('DEBUG', 'False').lower() == 'true'
     
     # File upload settings
-    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 100 * 1024 * 1024))  # 100MB default
-    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or os.path.join(os.getcwd(), 'data', 'uploads')
-    PROCESSED_FOLDER = os.environ.get('PROCESSED_FOLDER') or os.path.join(os.getcwd(), 'data', 'processed')
+    MAX_CONTENT_LENGTH = int(_env.get('MAX_CONTENT_LENGTH', 100 * 1024 * 1024))  # 100MB default
+    UPLOAD_FOLDER = _env.get('UPLOAD_FOLDER') or os.path.join(_cwd, 'data', 'uploads')
+    PROCESSED_FOLDER = _env.get('PROCESSED_FOLDER') or os.path.join(_cwd, 'data', 'processed')
     
     # Allowed file extensions
     ALLOWED_EXTENSIONS = {
@@ -29,9 +41,9 @@ class Config:
     }
     
     # Data processing settings
-    TRAJECTORY_TIMESTEP = float(os.environ.get('TRAJECTORY_TIMESTEP', 0.5))  # fs per frame
-    EQUILIBRATION_TIME = float(os.environ.get('EQUILIBRATION_TIME', 5000))   # fs
-    EXCITATION_INTERVAL = float(os.environ.get('EXCITATION_INTERVAL', 2))    # fs
+    TRAJECTORY_TIMESTEP = float(_env.get('TRAJECTORY_TIMESTEP', 0.5))  # fs per frame
+    EQUILIBRATION_TIME = float(_env.get('EQUILIBRATION_TIME', 5000))   # fs
+    EXCITATION_INTERVAL = float(_env.get('EXCITATION_INTERVAL', 2))    # fs
     
     # Analysis settings
     BOND_CUTOFFS = {
@@ -60,13 +72,20 @@ class Config:
         'S': 1.0, 'P': 1.0, 'F': 0.5, 'Cl': 0.75,
         'Br': 0.85, 'I': 0.95
     }
+
+    # Array-backed lookup tables built once at import: per-atom dict
+    # lookups in hot loops become a single fancy-index on these after
+    # symbols are mapped to ids (see element_ids below)
+    ELEMENT_ID = {sym: i for i, sym in enumerate(ATOM_SIZES)}
+    ATOM_SIZE_ARR = np.fromiter(ATOM_SIZES.values(), dtype=np.float32)
+    ATOM_COLOR_ARR = _rgb_table(ATOM_SIZES, ATOM_COLORS)
     
     # Cache settings
-    CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', 3600))  # 1 hour
+    CACHE_TIMEOUT = int(_env.get('CACHE_TIMEOUT', 3600))  # 1 hour
     
     # Logging
-    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.environ.get('LOG_FILE') or 'dmabn_viewer.log'
+    LOG_LEVEL = _env.get('LOG_LEVEL', 'INFO')
+    LOG_FILE = _env.get('LOG_FILE') or 'dmabn_viewer.log'
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -79,7 +98,7 @@ class ProductionConfig(Config):
     DEVELOPMENT = False
     
     # Use stronger secret key in production
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'production-secret-key-must-be-set'
+    SECRET_KEY = _env.get('SECRET_KEY') or 'production-secret-key-must-be-set'
     
     # Production-specific settings
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB for production
@@ -91,6 +110,18 @@ class TestingConfig(Config):
     UPLOAD_FOLDER = '/tmp/dmabn_test_uploads'
     PROCESSED_FOLDER = '/tmp/dmabn_test_processed'
 
+def element_ids(atoms):
+    """
+    Map element symbols to compact ids for the Config lookup arrays.
+
+    Unknown elements map to -1; callers can mask those or fall back to
+    defaults. Done once per trajectory, after which per-atom properties
+    are ATOM_SIZE_ARR[ids] / ATOM_COLOR_ARR[ids] instead of a dict
+    lookup per atom per frame.
+    """
+    return np.fromiter((Config.ELEMENT_ID.get(a, -1) for a in atoms),
+                        dtype=np.int32, count=len(atoms))
+
 # Configuration dictionary
 config = {
     'development': DevelopmentConfig,
@@ -7,33 +7,71 @@ Development server entry point
 import os
 import sys
 
+# gunicorn is optional: production installs have it (requirements.txt),
+# dev machines fall back to the Werkzeug server
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_AVAILABLE = True
+except ImportError:
+    GUNICORN_AVAILABLE = False
+
+def run_gunicorn(app, host, port):
+    """
+    Serve the app with gunicorn in-process.
+
+    The Werkzeug dev server is a single select()-based process; gunicorn
+    with gthread workers parses uploads in parallel across cores.
+    """
+
+    class StandaloneApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', 2 * os.cpu_count() + 1)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', 4)
+            # Recycle workers periodically to bound memory growth from
+            # large trajectory parses
+            self.cfg.set('max_requests', 1000)
+
+        def load(self):
+            return app
+
+    StandaloneApplication().run()
+
 if __name__ == '__main__':
     # Add current directory to path so imports work
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-    
+
     # Import the Flask app from app.py
     from app import app  # This imports the 'app' variable from your app.py file
-    
+
     # Development server settings
     debug_mode = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
     host = os.environ.get('FLASK_HOST', '0.0.0.0')
     port = int(os.environ.get('FLASK_PORT', 5000))
-    
+
     print("Starting DMABN MD Viewer...")
     print(f"Server: http://{host}:{port}")
     print(f"Debug mode: {debug_mode}")
     print("Make sure to upload your data files!")
     print("=" * 50)
-    
+
     try:
-        app.run(
-            debug=debug_mode,
-            host=host,
-            port=port,
-            threaded=True
-        )
+        if not debug_mode and GUNICORN_AVAILABLE:
+            run_gunicorn(app, host, port)
+        else:
+            # Werkzeug dev server: reloader and debugger, but
+            # single-process
+            if not debug_mode:
+                print("gunicorn not installed, using development server")
+            app.run(
+                debug=debug_mode,
+                host=host,
+                port=port,
+                threaded=True
+            )
     except KeyboardInterrupt:
         print("\nServer stopped by user")
     except Exception as e:
         print(f"Server error: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)